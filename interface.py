@@ -150,16 +150,24 @@ if __name__ == "__main__":
     # Continuer avec l'import de vos modules
     
 from PyQt6.QtWidgets import (QApplication,QMainWindow,QWidget,QVBoxLayout,QHBoxLayout,QLabel,QLineEdit,
-    QTextEdit,QPushButton,QGroupBox,QMessageBox,QTabWidget)
+    QTextEdit,QPushButton,QGroupBox,QMessageBox,QTabWidget,QFileDialog)
 from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QFontDatabase
 from verifier import appartient_grammaire_reguliere
 
 from graphing import *
+from metrics import metrics
+
+# Mesure du temps passé dans chaque étape
+appartient_grammaire_reguliere = metrics.instrument(appartient_grammaire_reguliere)
+grammaire_vers_automate = metrics.instrument(grammaire_vers_automate)
+draw_dfa = metrics.instrument(draw_dfa)
 
 
 global regle 
 global ax_depart
 
+@metrics.instrument
 def formatter_regle(Rule):
     regle={}
     rule = Rule.split()
@@ -194,6 +202,9 @@ class GrammarCheckerGUI(QMainWindow):
         check_tab = self.create_check_tab()
         tabs.addTab(check_tab, "Verification du mot et visualisation")
 
+        metrics_tab = self.create_metrics_tab()
+        tabs.addTab(metrics_tab, "Performances")
+
     def create_check_tab(self):
         widget = QWidget()
         layout = QVBoxLayout()
@@ -239,6 +250,55 @@ class GrammarCheckerGUI(QMainWindow):
 
         return widget
 
+    def create_metrics_tab(self):
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        stats_group = QGroupBox("Temps d'execution et taille de l'automate")
+        stats_layout = QVBoxLayout()
+
+        self.metrics_display = QTextEdit()
+        self.metrics_display.setReadOnly(True)
+        # police a chasse fixe pour aligner les colonnes
+        self.metrics_display.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        stats_layout.addWidget(self.metrics_display)
+
+        stats_group.setLayout(stats_layout)
+        layout.addWidget(stats_group)
+
+        # Export des metriques
+        export_group = QGroupBox("Export")
+        export_layout = QHBoxLayout()
+
+        self.refresh_metrics_button = QPushButton("Actualiser")
+        self.refresh_metrics_button.clicked.connect(self.refresh_metrics)
+        export_layout.addWidget(self.refresh_metrics_button)
+
+        self.export_json_button = QPushButton("Exporter JSON")
+        self.export_json_button.clicked.connect(lambda: self.export_metrics('json'))
+        export_layout.addWidget(self.export_json_button)
+
+        self.export_prom_button = QPushButton("Exporter Prometheus")
+        self.export_prom_button.clicked.connect(lambda: self.export_metrics('prometheus'))
+        export_layout.addWidget(self.export_prom_button)
+
+        export_layout.addWidget(QLabel("port: "))
+        self.metrics_port_input = QLineEdit()
+        self.metrics_port_input.setPlaceholderText("Ex: 9100")
+        export_layout.addWidget(self.metrics_port_input)
+
+        self.serve_metrics_button = QPushButton("Demarrer le serveur")
+        self.serve_metrics_button.clicked.connect(self.serve_metrics)
+        export_layout.addWidget(self.serve_metrics_button)
+
+        export_group.setLayout(export_layout)
+        layout.addWidget(export_group)
+
+        widget.setLayout(layout)
+        self.refresh_metrics()
+
+        return widget
+
     def create_grammar_tab(self):
         widget = QWidget()
         layout = QVBoxLayout()
@@ -336,21 +396,21 @@ class GrammarCheckerGUI(QMainWindow):
             ax_depart = axiom
             print(regle)
             automate = grammaire_vers_automate(regle, ax_depart)
+            metrics.record_automaton(automate)
             image_path = draw_dfa(automate, filename="automate")
             print("Image générée :", image_path)
 
 
-            print(appartient_grammaire_reguliere("ababab",regle,ax_depart))  # True
-            print(appartient_grammaire_reguliere("abbaabba",regle,ax_depart))  # False
-
             #mise a jour de l'affichage
             self.grammar_display.setHtml(f'<img src="{image_path}">')
             #display_text = f"variables: {variables}\n"
             #display_text += f"alphabet: {alphabet}\n"
             #display_text += f"Axiome: {axiom}\n"
             #self.grammar_display.setPlainText(display_text)
+            self.refresh_metrics()
             QMessageBox.information(self,"Succes", "Grammaire sauvegarde")
         except Exception as e:
+            self.refresh_metrics()
             QMessageBox.critical(self,"Erreur",f"Erreur lors de la sauvegarde: {str(e)}")
 
 
@@ -373,6 +433,47 @@ class GrammarCheckerGUI(QMainWindow):
         else:
             self.result_label.setText("Ce mot n'appartient pas a la grammaire")
         # on pourra aussi set un stylesheet
+        self.refresh_metrics()
+
+    def refresh_metrics(self):
+        data = metrics.snapshot()
+        if not data['operations']:
+            self.metrics_display.setPlainText("Aucune mesure pour le moment")
+            return
+        # p50/p95: borne du seau de l'histogramme contenant le quantile
+        text = f"{'operation':<32}{'appels':>8}{'erreurs':>9}{'moy (ms)':>11}{'dernier (ms)':>14}"
+        text += f"{'p50 (ms)':>11}{'p95 (ms)':>11}{'max (ms)':>11}\n"
+        for name, h in data['operations'].items():
+            text += f"{name:<32}{h['count']:>8}{h['errors']:>9}"
+            text += f"{h['mean_seconds'] * 1000:>11.3f}{h['last_seconds'] * 1000:>14.3f}"
+            text += f"{h['p50_seconds'] * 1000:>11.3f}{h['p95_seconds'] * 1000:>11.3f}{h['max_seconds'] * 1000:>11.3f}\n"
+        automate = {cle: 'inconnu' if valeur is None else valeur for cle, valeur in data['automaton'].items()}
+        text += f"\nAutomate: {automate['states']} etats, {automate['transitions']} transitions, "
+        text += f"{automate['alphabet']} symboles\n"
+        self.metrics_display.setPlainText(text)
+
+    def export_metrics(self, fmt):
+        default = "metrics.json" if fmt == 'json' else "metrics.prom"
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter les metriques", default)
+        if not path:
+            return
+        try:
+            metrics.export_file(path, fmt)
+            QMessageBox.information(self, "Succes", f"Metriques exportees: {path}")
+        except OSError as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'export: {str(e)}")
+
+    def serve_metrics(self):
+        try:
+            port = int(self.metrics_port_input.text().strip())
+            if not 0 <= port <= 65535:
+                raise ValueError(port)
+            host, port = metrics.serve(port)
+            QMessageBox.information(self, "Succes", f"Metriques disponibles sur http://{host}:{port}/metrics")
+        except ValueError:
+            QMessageBox.warning(self, "Erreur", "veuillez entrer un numero de port valide")
+        except OSError as e:
+            QMessageBox.critical(self, "Erreur", f"Impossible de demarrer le serveur: {str(e)}")
 
 
 
@@ -0,0 +1,262 @@
+"""
+Instrumentation des temps d'exécution et export des métriques
+"""
+import json
+import time
+import threading
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bornes des histogrammes de latence (en secondes), façon Prometheus
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Taille d'automate inconnue (aucun automate ou structure non reconnue)
+UNKNOWN_SIZE = {'states': None, 'transitions': None, 'alphabet': None}
+
+
+class LatencyHistogram:
+    """Histogramme cumulatif des durées d'un appel"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def observe(self, duration, error=False):
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        self.max = max(self.max, duration)
+        if error:
+            self.errors += 1
+        for i, borne in enumerate(self.buckets):
+            if duration <= borne:
+                self.counts[i] += 1
+
+    def quantile(self, q):
+        """Borne supérieure du premier seau contenant le quantile q"""
+        if not self.count:
+            return 0.0
+        rang = q * self.count
+        for borne, count in zip(self.buckets, self.counts):
+            if count >= rang:
+                return borne
+        # Au-delà du dernier seau: la durée maximale observée
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'sum_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'last_seconds': self.last,
+            'max_seconds': self.max,
+            'p50_seconds': self.quantile(0.5),
+            'p95_seconds': self.quantile(0.95),
+            'buckets': {str(b): c for b, c in zip(self.buckets, self.counts)},
+        }
+
+
+class PerformanceMetrics:
+    """Collecte les latences, compteurs et tailles d'automate"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.automaton = dict(UNKNOWN_SIZE)
+        self._server = None
+
+    def observe(self, name, duration, error=False):
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram()
+            self.histograms[name].observe(duration, error)
+
+    def instrument(self, func, name=None):
+        """Enveloppe une fonction pour mesurer chacun de ses appels"""
+        name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            debut = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                self.observe(name, time.perf_counter() - debut, error=True)
+                raise
+            self.observe(name, time.perf_counter() - debut)
+            return result
+
+        return wrapper
+
+    def record_automaton(self, automate):
+        """Relève le nombre d'états, de transitions et de symboles d'un automate"""
+        try:
+            taille = _automaton_size(automate)
+        except Exception as e:
+            # Structure d'automate inconnue: ne pas garder la taille du précédent
+            print(f"⚠️ Taille de l'automate inconnue: {e}")
+            taille = dict(UNKNOWN_SIZE)
+        with self._lock:
+            self.automaton = taille
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.automaton = dict(UNKNOWN_SIZE)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'operations': {n: h.as_dict() for n, h in self.histograms.items()},
+                'automaton': dict(self.automaton),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+    def to_prometheus(self):
+        """Format texte d'exposition Prometheus"""
+        data = self.snapshot()
+        lignes = [
+            "# HELP grammar_operation_duration_seconds Durée des opérations instrumentées",
+            "# TYPE grammar_operation_duration_seconds histogram",
+        ]
+        for name, h in data['operations'].items():
+            for borne, count in h['buckets'].items():
+                lignes.append(f'grammar_operation_duration_seconds_bucket{{operation="{name}",le="{borne}"}} {count}')
+            lignes.append(f'grammar_operation_duration_seconds_bucket{{operation="{name}",le="+Inf"}} {h["count"]}')
+            lignes.append(f'grammar_operation_duration_seconds_sum{{operation="{name}"}} {h["sum_seconds"]}')
+            lignes.append(f'grammar_operation_duration_seconds_count{{operation="{name}"}} {h["count"]}')
+        lignes.append("# HELP grammar_operation_errors_total Nombre d'appels terminés par une exception")
+        lignes.append("# TYPE grammar_operation_errors_total counter")
+        for name, h in data['operations'].items():
+            lignes.append(f'grammar_operation_errors_total{{operation="{name}"}} {h["errors"]}')
+        for cle, valeur in data['automaton'].items():
+            if valeur is None:
+                continue
+            lignes.append(f"# HELP grammar_automaton_{cle} Taille du dernier automate généré")
+            lignes.append(f"# TYPE grammar_automaton_{cle} gauge")
+            lignes.append(f"grammar_automaton_{cle} {valeur}")
+        return "\n".join(lignes) + "\n"
+
+    def export_file(self, path, fmt=None):
+        """Écrit les métriques dans un fichier (json ou prometheus)"""
+        fmt = fmt or ('json' if str(path).endswith('.json') else 'prometheus')
+        contenu = self.to_json() if fmt == 'json' else self.to_prometheus()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(contenu)
+        return path
+
+    def serve(self, port, host='127.0.0.1'):
+        """Expose /metrics (Prometheus) et /metrics.json sur un port local"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics.json':
+                    body, ctype = metrics.to_json(), 'application/json'
+                elif self.path in ('/', '/metrics'):
+                    body, ctype = metrics.to_prometheus(), 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', f'{ctype}; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        # Lier le nouveau port avant d'arrêter l'ancien serveur
+        server = ThreadingHTTPServer((host, port), Handler)
+        self.stop_server()
+        self._server = server
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address
+
+    def stop_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _lookup(obj, *names):
+    """Cherche un attribut ou une clé parmi plusieurs noms possibles"""
+    for name in names:
+        if isinstance(obj, dict) and name in obj:
+            return obj[name]
+        if hasattr(obj, name):
+            return getattr(obj, name)
+    return None
+
+
+def _automaton_size(automate):
+    """Calcule la taille d'un automate, à défaut à partir de ses transitions"""
+    states = _lookup(automate, 'etats', 'states')
+    transitions = _lookup(automate, 'transitions', 'delta')
+    alphabet = _lookup(automate, 'alphabet', 'symboles', 'sigma')
+    if transitions is None:
+        raise ValueError("transitions introuvables")
+
+    symboles = set()
+    etats = set()
+    nb_transitions = 0
+    for source, cible, symbole in _iter_transitions(transitions):
+        # Automate non déterministe: une transition par état cible
+        cibles = cible if isinstance(cible, (set, frozenset, list, tuple)) else [cible]
+        nb_transitions += len(cibles)
+        etats.add(source)
+        etats.update(cibles)
+        symboles.add(symbole)
+
+    return {
+        'states': _length(states, len(etats)),
+        'transitions': nb_transitions,
+        'alphabet': _length(alphabet, len(symboles)),
+    }
+
+
+def _length(valeur, defaut):
+    """len() de la valeur, ou la valeur par défaut si elle n'en a pas"""
+    try:
+        return len(valeur)
+    except TypeError:
+        return defaut
+
+
+def _iter_transitions(transitions):
+    """Parcourt les transitions sous forme (source, cible, symbole)"""
+    if not transitions:
+        return
+    if isinstance(transitions, dict):
+        for cle, valeur in transitions.items():
+            if isinstance(cle, tuple) and len(cle) == 2:
+                # {(etat, symbole): cible}
+                yield cle[0], valeur, cle[1]
+            elif isinstance(valeur, dict):
+                # {etat: {symbole: cible}}
+                for symbole, cible in valeur.items():
+                    yield cle, cible, symbole
+            else:
+                # {etat: [(symbole, cible), ...]}
+                for symbole, cible in valeur:
+                    yield cle, cible, symbole
+    else:
+        # [(source, symbole, cible), ...]
+        for source, symbole, cible in transitions:
+            yield source, cible, symbole
+
+
+# Instance partagée par l'application
+metrics = PerformanceMetrics()
@@ -49,7 +49,7 @@ def build_spec():
     
     spec = {
         'name': 'GrammaireChecker',
-        'input_files': ['src/interface.py', 'src/graphing.py', 'src/verifier.py'],
+        'input_files': ['src/interface.py', 'src/graphing.py', 'src/verifier.py', 'src/metrics.py'],
         'data_files': graphviz_files,
         'hidden_imports': ['graphviz', 'graphviz.backend', 'graphviz.backend.execute'],
         'options': {
@@ -0,0 +1,143 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from metrics import LatencyHistogram, PerformanceMetrics
+
+
+def test_histogram_buckets_are_cumulative():
+    h = LatencyHistogram(buckets=(0.01, 0.1, 1.0))
+    for duration in (0.005, 0.05, 0.5, 2.0):
+        h.observe(duration)
+    assert h.counts == [1, 2, 3]
+    assert h.count == 4
+    assert h.total == pytest.approx(2.555)
+    assert h.max == 2.0
+
+
+def test_histogram_quantiles_from_buckets():
+    h = LatencyHistogram(buckets=(0.01, 0.1, 1.0))
+    assert h.quantile(0.5) == 0.0
+    for duration in [0.005] * 10 + [0.05] * 8 + [2.0] * 2:
+        h.observe(duration)
+    assert h.quantile(0.5) == 0.01
+    assert h.quantile(0.9) == 0.1
+    assert h.quantile(0.95) == 2.0
+
+
+def test_histogram_counts_errors():
+    h = LatencyHistogram()
+    h.observe(0.001)
+    h.observe(0.001, error=True)
+    assert h.as_dict()['errors'] == 1
+
+
+def test_instrument_records_calls_and_errors():
+    m = PerformanceMetrics()
+
+    @m.instrument
+    def boom(fail):
+        if fail:
+            raise RuntimeError
+        return 42
+
+    assert boom(False) == 42
+    with pytest.raises(RuntimeError):
+        boom(True)
+    op = m.snapshot()['operations']['boom']
+    assert op['count'] == 2
+    assert op['errors'] == 1
+
+
+def test_prometheus_inf_sum_and_count():
+    m = PerformanceMetrics()
+    m.observe('draw_dfa', 0.25)
+    m.observe('draw_dfa', 10.0)
+    lignes = m.to_prometheus().splitlines()
+    assert 'grammar_operation_duration_seconds_bucket{operation="draw_dfa",le="0.25"} 1' in lignes
+    assert 'grammar_operation_duration_seconds_bucket{operation="draw_dfa",le="+Inf"} 2' in lignes
+    assert 'grammar_operation_duration_seconds_sum{operation="draw_dfa"} 10.25' in lignes
+    assert 'grammar_operation_duration_seconds_count{operation="draw_dfa"} 2' in lignes
+
+
+def test_export_file_format_from_extension(tmp_path):
+    m = PerformanceMetrics()
+    m.observe('formatter_regle', 0.001)
+    json_path = m.export_file(tmp_path / "metrics.json")
+    assert 'formatter_regle' in json.loads(json_path.read_text(encoding='utf-8'))['operations']
+    prom_path = m.export_file(tmp_path / "metrics.prom")
+    assert prom_path.read_text(encoding='utf-8').startswith("# HELP")
+
+
+def test_serve_endpoints():
+    m = PerformanceMetrics()
+    m.observe('draw_dfa', 0.01)
+    host, port = m.serve(0)
+    base = f"http://{host}:{port}"
+    try:
+        with urllib.request.urlopen(f"{base}/metrics") as r:
+            assert r.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert 'operation="draw_dfa"' in r.read().decode('utf-8')
+        with urllib.request.urlopen(f"{base}/metrics.json") as r:
+            assert r.headers['Content-Type'].startswith('application/json')
+            assert json.loads(r.read())['operations']['draw_dfa']['count'] == 1
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(f"{base}/inconnu")
+        assert e.value.code == 404
+    finally:
+        m.stop_server()
+    assert m._server is None
+
+
+@pytest.mark.parametrize("automate", [
+    # {(etat, symbole): cible}
+    {'transitions': {('S', 'a'): 'A', ('A', 'b'): 'S', ('A', 'a'): 'F'}},
+    # {etat: {symbole: cible}}
+    {'transitions': {'S': {'a': 'A'}, 'A': {'b': 'S', 'a': 'F'}}},
+    # {etat: [(symbole, cible), ...]}
+    {'transitions': {'S': [('a', 'A')], 'A': [('b', 'S'), ('a', 'F')]}},
+    # [(source, symbole, cible), ...]
+    {'transitions': [('S', 'a', 'A'), ('A', 'b', 'S'), ('A', 'a', 'F')]},
+])
+def test_record_automaton_layouts(automate):
+    m = PerformanceMetrics()
+    m.record_automaton(automate)
+    assert m.automaton == {'states': 3, 'transitions': 3, 'alphabet': 2}
+
+
+def test_record_automaton_counts_each_nfa_target():
+    m = PerformanceMetrics()
+    m.record_automaton({'transitions': {'q0': {'a': {'q1', 'q2'}}}})
+    assert m.automaton == {'states': 3, 'transitions': 2, 'alphabet': 1}
+
+
+def test_record_automaton_prefers_declared_sizes():
+    class Automate:
+        states = {'S', 'A', 'P'}
+        alphabet = {'a', 'b', 'c'}
+        transitions = {('S', 'a'): 'A'}
+
+    m = PerformanceMetrics()
+    m.record_automaton(Automate())
+    assert m.automaton == {'states': 3, 'transitions': 1, 'alphabet': 3}
+
+
+def test_record_automaton_never_raises():
+    class Automate:
+        states = 4
+        transitions = {('S', 'a'): 'A'}
+
+    m = PerformanceMetrics()
+    m.record_automaton(Automate())
+    assert m.automaton == {'states': 2, 'transitions': 1, 'alphabet': 1}
+
+
+@pytest.mark.parametrize("automate", [object(), ('S', {'a'}, {}), {'transitions': {'S': 5}}])
+def test_record_automaton_unknown_structure_resets_sizes(automate):
+    m = PerformanceMetrics()
+    m.record_automaton({'transitions': {('S', 'a'): 'A'}})
+    m.record_automaton(automate)
+    assert m.automaton == {'states': None, 'transitions': None, 'alphabet': None}
+    assert 'grammar_automaton_' not in m.to_prometheus()